@@ -1,10 +1,23 @@
+import io
 import os
 import sys
+import atexit
+import functools
 import logging
-from flask import Flask, render_template, request, jsonify, flash, redirect, url_for, session
+import threading
+import multiprocessing
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+from flask import Flask, Response, render_template, request, jsonify, flash, get_flashed_messages, redirect, url_for, session
+from flask.globals import request_ctx
 from werkzeug.utils import secure_filename
+from flask_caching import Cache
+from jinja2 import Environment
+from json_provider import OrjsonProvider
 import json
+import orjson
 import uuid
+import hashlib
 import datetime
 
 # Set up logging
@@ -12,10 +25,12 @@ logging.basicConfig(level=logging.DEBUG)
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Load configuration
 from config import configure_app
 configure_app(app)
+cache = Cache(app)
 
 # Firebase configuration
 try:
@@ -24,18 +39,130 @@ try:
 except ImportError:
     app.logger.warning("Firebase configuration not found. Firebase features will be disabled.")
 
-# Import utilities after app configuration
-from utils.gemini_api import analyze_text_with_gemini
-from utils.document_parser import extract_text_from_document
+# Document parsing is CPU-bound, so run it in worker processes to keep it
+# off the GIL shared by the request threads. Workers come from a forkserver:
+# forking a threaded gunicorn worker could copy locks held by other threads.
+# Every gunicorn worker has its own pool, so the cores are split between the
+# 2 workers the deployment runs; set PARSE_WORKERS to size each pool directly.
+GUNICORN_WORKERS = 2
+DEFAULT_PARSE_WORKERS = max(1, (os.cpu_count() or 1) // GUNICORN_WORKERS)
+
+def create_parse_pool():
+    """Create the process pool used for document parsing."""
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=int(os.environ.get('PARSE_WORKERS', DEFAULT_PARSE_WORKERS)),
+        mp_context=multiprocessing.get_context('forkserver')
+    )
+
+PARSE_POOL = create_parse_pool()
+PARSE_POOL_LOCK = threading.Lock()
+atexit.register(lambda: PARSE_POOL.shutdown())
+
+# Allowed upload extensions, read once instead of from app.config per upload
+ALLOWED_EXTENSIONS = app.config['ALLOWED_EXTENSIONS']
+
+# Copy uploads to disk in 1 MiB chunks instead of Werkzeug's 16 KiB default
+UPLOAD_BUFFER_SIZE = 1024 * 1024
+
+# Common legal terms reported by the Legal BERT validation
+LEGAL_TERMS = ('agreement', 'contract', 'party', 'liability', 'indemnity',
+               'term', 'clause', 'herein', 'pursuant', 'warrant')
+# Larger documents are only scanned at their start and end
+LEGAL_TERMS_SAMPLE_SIZE = 256 * 1024
+
+# Document generation prompts, compiled once per document type
+DOCUMENT_PROMPT_HEADER = (
+    "You are an expert legal document generator specialized in Indian law. "
+    "Generate a professional {{ document_type }} with the following details:\n\n"
+    "{% for name, value in fields %}{{ name }}: {{ value }}\n{% endfor %}\n"
+)
+DOCUMENT_PROMPT_FOOTER = (
+    "\n\nFormat the document professionally with clear sections, numbering, and legal language. "
+    "Ensure all provisions are legally sound and compliant with current Indian legislation."
+)
+DOCUMENT_INSTRUCTIONS = {
+    'employment': "This should be a comprehensive employment contract compliant with Indian labor laws. Include sections for compensation, working hours, confidentiality, intellectual property, termination conditions, and dispute resolution.",
+    'nda': "This should be a detailed non-disclosure agreement that protects confidential information under Indian law. Include sections defining confidential information, obligations of the receiving party, exclusions, term of agreement, and remedies for breach.",
+    'lease': "This should be a comprehensive lease agreement compliant with Indian property laws and Rent Control Acts. Include sections on rent, security deposit, maintenance responsibilities, term of lease, conditions for termination, and dispute resolution.",
+    'service': "This should be a detailed service agreement compliant with Indian contract law. Include sections on scope of services, payment terms, intellectual property rights, confidentiality, term and termination, warranties, and limitations of liability.",
+    'shareholders': "This should be a comprehensive shareholders agreement compliant with the Indian Companies Act, 2013. Include sections on share ownership, transfer restrictions, management structure, dividend policy, reserved matters, dispute resolution, and exit provisions.",
+    'custom': "This should be a professional legal document that addresses the specified requirements while ensuring compliance with relevant Indian laws and regulations."
+}
+prompt_env = Environment(autoescape=False)
+PROMPT_TEMPLATES = {
+    document_type: prompt_env.from_string(DOCUMENT_PROMPT_HEADER + instructions + DOCUMENT_PROMPT_FOOTER)
+    for document_type, instructions in DOCUMENT_INSTRUCTIONS.items()
+}
 
 # Helper functions
 def allowed_file(filename):
     """Check if the uploaded file has an allowed extension."""
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
+    _, dot, extension = filename.rpartition('.')
+    return bool(dot) and extension.lower() in ALLOWED_EXTENSIONS
 
-def get_firebase_config_for_template():
-    """Get Firebase configuration for templates."""
+def save_upload(file, file_path):
+    """Save an uploaded file to disk, copying in the kernel when possible."""
+    stream = file.stream
+    # Werkzeug spools large uploads to a temporary file; smaller ones stay in
+    # memory and have no descriptor to copy from
+    if not hasattr(os, 'sendfile') or not getattr(stream, '_rolled', True):
+        file.save(file_path, buffer_size=UPLOAD_BUFFER_SIZE)
+        return
+    try:
+        src_fd = stream.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        file.save(file_path, buffer_size=UPLOAD_BUFFER_SIZE)
+        return
+    
+    stream.flush()
+    offset = stream.tell()
+    dst_fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        try:
+            while copied := os.copy_file_range(src_fd, dst_fd, UPLOAD_BUFFER_SIZE, offset):
+                offset += copied
+        except (AttributeError, OSError):
+            # copy_file_range is missing or unsupported for these files
+            pass
+        # Some filesystems return 0 from copy_file_range instead of failing,
+        # so like shutil always let sendfile finish from where it stopped
+        while sent := os.sendfile(dst_fd, src_fd, offset, UPLOAD_BUFFER_SIZE):
+            offset += sent
+    finally:
+        os.close(dst_fd)
+
+def parse_document(file_path):
+    """Extract a document's text in the parser pool, replacing the pool if a worker died."""
+    global PARSE_POOL
+    from utils.document_parser import extract_text_from_document
+    
+    pool = PARSE_POOL
+    try:
+        return pool.submit(extract_text_from_document, file_path).result()
+    except BrokenProcessPool:
+        # A parser process was killed (e.g. out of memory on a hostile PDF);
+        # fail this upload but give later ones a working pool
+        with PARSE_POOL_LOCK:
+            if PARSE_POOL is pool:
+                app.logger.error("Document parser pool broke; starting a new one")
+                PARSE_POOL = create_parse_pool()
+                pool.shutdown(wait=False)
+        raise
+
+def analyze_with_gemini_cached(prompt):
+    """Analyze a prompt with Gemini, reusing the stored result for identical prompts."""
+    from gemini_client import analyze_text_with_gemini
+    
+    # Results from one model are not valid for another
+    cache_key = f"gemini:{app.config['GEMINI_MODEL']}:" + hashlib.sha256(prompt.encode()).hexdigest()
+    result = cache.get(cache_key)
+    if result is None:
+        result = analyze_text_with_gemini(prompt, app.config['GEMINI_API_KEY'], app.config['GEMINI_MODEL'])
+        cache.set(cache_key, result)
+    return result
+
+def build_firebase_template_context():
+    """Build the Firebase configuration passed to templates."""
     firebase_config = {}
     try:
         from firebase_config import get_firebase_config
@@ -49,8 +176,18 @@ def get_firebase_config_for_template():
         'firebase_app_id': firebase_config.get('appId', app.config.get('FIREBASE_APP_ID', ''))
     }
 
+def get_firebase_config_for_template():
+    """Get Firebase configuration for templates."""
+    return app.config['FIREBASE_TEMPLATE_CTX']
+
 def get_legal_bert_validation(text, analysis_type='compliance'):
-    """Simulate a Legal BERT validation result"""
+    """Simulate a Legal BERT validation result.
+    
+    Legal terms are only looked for in the first and last
+    LEGAL_TERMS_SAMPLE_SIZE / 2 characters of very large documents, so the
+    term list is an estimate for those. When a real model replaces this stub,
+    keep the sampled scan as a cheap pre-filter for non-legal documents.
+    """
     # This would typically be a call to a specific model or API
     # For now, we'll generate a simulated validation based on text length
     text_length = len(text)
@@ -71,13 +208,19 @@ def get_legal_bert_validation(text, analysis_type='compliance'):
         red_flags = 5
     
     # Identify common legal terms
-    legal_terms = []
-    common_terms = ['agreement', 'contract', 'party', 'liability', 'indemnity', 
-                   'term', 'clause', 'herein', 'pursuant', 'warrant']
+    # Each sample is lowercased once; samples are bounded by
+    # LEGAL_TERMS_SAMPLE_SIZE, so the copy never grows with the document
+    if text_length <= LEGAL_TERMS_SAMPLE_SIZE:
+        samples = (text,)
+    else:
+        half = LEGAL_TERMS_SAMPLE_SIZE // 2
+        samples = (text[:half], text[-half:])
     
-    for term in common_terms:
-        if term in text.lower():
-            legal_terms.append(term)
+    found_terms = set()
+    for sample in samples:
+        lowered = sample.lower()
+        found_terms.update(term for term in LEGAL_TERMS if term in lowered)
+    legal_terms = [term for term in LEGAL_TERMS if term in found_terms]
     
     return {
         'compliance_status': status,
@@ -86,66 +229,137 @@ def get_legal_bert_validation(text, analysis_type='compliance'):
         'red_flags_count': red_flags
     }
 
+# The Firebase template configuration is constant for the app's lifetime
+app.config['FIREBASE_TEMPLATE_CTX'] = build_firebase_template_context()
+FIREBASE_CONFIG_JSON = orjson.dumps(app.config['FIREBASE_TEMPLATE_CTX'])
+
+@app.context_processor
+def inject_firebase_config():
+    """Expose the Firebase configuration to every template."""
+    return get_firebase_config_for_template()
+
+def page_is_visitor_specific():
+    """Check whether this render read the session or flashed messages.
+    
+    Flask 3.1+ marks the session accessed whenever the session proxy is used,
+    so the request context's own attributes are read instead. If they are
+    missing (Flask renamed its internals), every render counts as
+    visitor-specific so personalised pages are never shared.
+    """
+    ctx_attrs = getattr(request_ctx._get_current_object(), '__dict__', {})
+    session_key = '_session' if '_session' in ctx_attrs else 'session'
+    if session_key not in ctx_attrs or 'flashes' not in ctx_attrs:
+        return True
+    
+    current_session = ctx_attrs[session_key]
+    session_accessed = current_session is not None and getattr(current_session, 'accessed', True)
+    return session_accessed or ctx_attrs['flashes'] is not None
+
+def page_cache_works():
+    """Check at startup that this Flask version lets pages be cached safely."""
+    with app.test_request_context():
+        if page_is_visitor_specific():
+            return False
+        session.get('user_id')
+        if not page_is_visitor_specific():
+            return False
+    with app.test_request_context():
+        get_flashed_messages()
+        return page_is_visitor_specific()
+
+# Without working detection every page would be treated as visitor-specific,
+# so skip the cache altogether and say why
+PAGE_CACHE_ENABLED = page_cache_works()
+if not PAGE_CACHE_ENABLED:
+    app.logger.warning("Can't detect session use on this Flask version; page caching disabled")
+
+def cached_page(view):
+    """Serve a page rendered once, answering matching If-None-Match with 304.
+    
+    A render that read the session or flashed messages depends on the visitor,
+    so it is returned as-is and never stored.
+    """
+    if not PAGE_CACHE_ENABLED:
+        return view
+    
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        page_cache = app.extensions.setdefault('page_cache', {})
+        page = page_cache.get(view.__name__)
+        # Re-render every time while templates are being auto-reloaded (debug)
+        if page is None or app.jinja_env.auto_reload:
+            body = view(*args, **kwargs)
+            if page_is_visitor_specific():
+                return body
+            body = body.encode()
+            page = page_cache[view.__name__] = (hashlib.sha256(body).hexdigest(), body)
+        
+        etag, body = page
+        response = app.response_class(body, mimetype='text/html')
+        response.set_etag(etag)
+        response.cache_control.private = True
+        return response.make_conditional(request)
+    return wrapper
+
 # Routes
 @app.route('/')
+@cached_page
 def index():
     """Render the homepage."""
-    # Get Firebase config using the helper function
-    firebase_config = get_firebase_config_for_template()
-    
-    # Pass Firebase configuration to the template
-    return render_template('index.html', **firebase_config)
+    return render_template('index.html')
 
 @app.route('/login')
+@cached_page
 def login():
     """Render the login page."""
-    # Get Firebase config using the helper function
-    firebase_config = get_firebase_config_for_template()
-    
-    # Pass Firebase configuration to the template
-    return render_template('login.html', **firebase_config)
+    return render_template('login.html')
 
 @app.route('/document-analysis')
+@cached_page
 def document_analysis():
     """Render the document analysis page."""
-    # Get Firebase config using the helper function
-    firebase_config = get_firebase_config_for_template()
-    
-    # Pass Firebase configuration to the template
-    return render_template('document_analysis.html', **firebase_config)
+    return render_template('document_analysis.html')
 
 @app.route('/about')
+@cached_page
 def about():
     """Render the about page."""
-    firebase_config = get_firebase_config_for_template()
-    return render_template('about.html', **firebase_config)
+    return render_template('about.html')
 
 @app.route('/templates')
+@cached_page
 def templates():
     """Render the document templates page."""
-    firebase_config = get_firebase_config_for_template()
-    return render_template('templates.html', **firebase_config)
+    return render_template('templates.html')
     
 @app.route('/history')
+@cached_page
 def history():
     """Render the document history page."""
-    firebase_config = get_firebase_config_for_template()
-    return render_template('history.html', **firebase_config)
+    return render_template('history.html')
 
 @app.route('/generating')
 def generating():
     """Render the document generation page."""
-    firebase_config = get_firebase_config_for_template()
     redirect_url = request.args.get('redirect_url', url_for('document_analysis'))
-    return render_template('generating.html', redirect_url=redirect_url, **firebase_config)
+    return render_template('generating.html', redirect_url=redirect_url)
 
 @app.route('/generate')
+@cached_page
 def generate():
     """Render the document generation page."""
-    firebase_config = get_firebase_config_for_template()
-    return render_template('generating.html', **firebase_config)
+    return render_template('generating.html')
 
 # API endpoints
+@app.route('/api/firebase-config')
+def firebase_config_json():
+    """Serve the client Firebase configuration as cacheable JSON."""
+    return Response(
+        FIREBASE_CONFIG_JSON,
+        mimetype='application/json',
+        headers={'Cache-Control': 'public, max-age=3600, immutable'}
+    )
+
 @app.route('/api/analyze-document', methods=['POST'])
 def analyze_document():
     """API endpoint to analyze uploaded documents."""
@@ -177,15 +391,19 @@ def analyze_document():
         # Secure the filename and save the file
         filename = secure_filename(file.filename)
         file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{uuid.uuid4()}_{filename}")
-        file.save(file_path)
         
-        # Extract text from the document
-        document_text = extract_text_from_document(file_path)
+        # Extract text from the document; only the text is kept afterwards
+        try:
+            save_upload(file, file_path)
+            document_text = parse_document(file_path)
+        finally:
+            if os.path.exists(file_path):
+                os.unlink(file_path)
         document_length = len(document_text)
         
         # Use Gemini to analyze the document
         analysis_prompt = f"You are a legal document analyzer. Please provide a {analysis_type} of the following document:\n\n{document_text}"
-        analysis_result = analyze_text_with_gemini(analysis_prompt, app.config['GEMINI_API_KEY'])
+        analysis_result = analyze_with_gemini_cached(analysis_prompt)
         
         # Generate legal BERT validation
         legal_bert_validation = get_legal_bert_validation(document_text, analysis_type)
@@ -224,7 +442,7 @@ def analyze_text():
         
         # Use Gemini to analyze the text
         analysis_prompt = f"You are a legal document analyzer. Please provide a {analysis_type} of the following legal text:\n\n{legal_text}"
-        analysis_result = analyze_text_with_gemini(analysis_prompt, app.config['GEMINI_API_KEY'])
+        analysis_result = analyze_with_gemini_cached(analysis_prompt)
         
         # Generate legal BERT validation
         legal_bert_validation = get_legal_bert_validation(legal_text, analysis_type)
@@ -270,13 +488,16 @@ def auth_signin():
                 'message': 'User ID is required'
             }), 400
             
+        # All timestamps written for this sign-in share one instant
+        now_iso = datetime.datetime.now().isoformat()
+        
         # Store user info in session
         session['user_id'] = uid
         session['email'] = email
         session['display_name'] = display_name
         session['photo_url'] = photo_url
         session['logged_in'] = True
-        session['login_time'] = datetime.datetime.now().isoformat()
+        session['login_time'] = now_iso
         
         app.logger.info(f"User signed in: {email} ({uid})")
         
@@ -284,54 +505,43 @@ def auth_signin():
         firestore_success = False
         try:
             if 'firebase_config' in sys.modules:
-                from firebase_config import get_firestore_db, is_firebase_initialized, is_client_side_only_mode
+                from firebase_config import get_firestore_db, is_client_side_only_mode
                 
-                if is_firebase_initialized() and not is_client_side_only_mode():
-                    db = get_firestore_db()
-                    if db:
-                        # Store user data in Firestore
-                        user_data = {
-                            'email': email,
-                            'displayName': display_name,
-                            'photoURL': photo_url,
-                            'lastLogin': datetime.datetime.now().isoformat(),
-                            'loginCount': 1,  # Will be incremented with arrayUnion
-                            'userAgent': request.headers.get('User-Agent', 'Unknown'),
-                            'ipAddress': request.remote_addr
-                        }
+                # The first call initializes Firebase
+                db = get_firestore_db()
+                if db and not is_client_side_only_mode():
+                    from firebase_admin import firestore
+                    from google.api_core.exceptions import NotFound
                         
-                        # Check if user document already exists
-                        user_ref = db.collection('users').document(uid)
-                        user_doc = user_ref.get()
+                    user_ref = db.collection('users').document(uid)
+                    user_data = {
+                        'email': email,
+                        'displayName': display_name,
+                        'photoURL': photo_url,
+                        'lastLogin': now_iso,
+                        'lastSeen': now_iso,
+                        'userAgent': request.headers.get('User-Agent', 'Unknown'),
+                        'ipAddress': request.remote_addr
+                    }
                         
-                        if user_doc.exists:
-                            # Update existing user
-                            user_ref.update({
-                                'email': email,
-                                'displayName': display_name,
-                                'photoURL': photo_url,
-                                'lastLogin': datetime.datetime.now().isoformat(),
-                                'loginCount': user_doc.get('loginCount', 0) + 1,
-                                'userAgent': request.headers.get('User-Agent', 'Unknown'),
-                                'ipAddress': request.remote_addr,
-                                'lastSeen': datetime.datetime.now().isoformat()
-                            })
-                            app.logger.info(f"Updated existing user in Firestore: {uid}")
-                        else:
-                            # Create new user
-                            user_data['createdAt'] = datetime.datetime.now().isoformat()
-                            user_data['lastSeen'] = datetime.datetime.now().isoformat()
-                            user_ref.set(user_data)
-                            app.logger.info(f"Created new user in Firestore: {uid}")
+                    try:
+                        # Update existing user in a single round trip; the
+                        # login count is incremented atomically server-side
+                        user_ref.update({**user_data, 'loginCount': firestore.Increment(1)})
+                        app.logger.info(f"Updated existing user in Firestore: {uid}")
+                    except NotFound:
+                        # Create new user
+                        user_ref.set({**user_data, 'loginCount': 1, 'createdAt': now_iso})
+                        app.logger.info(f"Created new user in Firestore: {uid}")
                             
-                            # Also create an empty history collection for the user
-                            history_ref = user_ref.collection('history')
-                            history_ref.document('info').set({
-                                'created': datetime.datetime.now().isoformat(),
-                                'count': 0
-                            })
+                        # Also create an empty history collection for the user
+                        history_ref = user_ref.collection('history')
+                        history_ref.document('info').set({
+                            'created': now_iso,
+                            'count': 0
+                        })
                             
-                        firestore_success = True
+                    firestore_success = True
                 else:
                     # Using client-side only mode
                     app.logger.info("Using client-side only Firebase auth - user data stored in session")
@@ -367,31 +577,35 @@ def auth_signin():
 @app.route('/api/auth/signout', methods=['POST'])
 def auth_signout():
     """Handle user sign out."""
+    # Get user ID before clearing the session
+    user_id = session.get('user_id')
+    
+    # Nobody is signed in, so leave the session (and its cookie) untouched
+    if not user_id:
+        return jsonify({
+            'status': 'success',
+            'message': 'User signed out successfully'
+        })
+    
     try:
-        # Get user ID before clearing the session
-        user_id = session.get('user_id')
-        
-        if user_id:
-            # Try to update the user's last logout time in Firestore
-            try:
-                if 'firebase_config' in sys.modules:
-                    from firebase_config import get_firestore_db, is_firebase_initialized, is_client_side_only_mode
-                    
-                    if is_firebase_initialized() and not is_client_side_only_mode():
-                        db = get_firestore_db()
-                        if db:
-                            # Update user document with logout time
-                            user_ref = db.collection('users').document(user_id)
-                            user_ref.update({
-                                'lastLogout': datetime.datetime.now().isoformat(),
-                                'lastSeen': datetime.datetime.now().isoformat()
-                            })
-                            app.logger.info(f"Updated user logout time in Firestore: {user_id}")
-            except Exception as e:
-                app.logger.warning(f"Could not update user logout time in Firestore: {e}")
-        
-        # Clear the session
-        session.clear()
+        # Try to update the user's last logout time in Firestore
+        try:
+            if 'firebase_config' in sys.modules:
+                from firebase_config import get_firestore_db, is_client_side_only_mode
+                
+                # The first call initializes Firebase
+                db = get_firestore_db()
+                if db and not is_client_side_only_mode():
+                    # Update user document with logout time
+                    now_iso = datetime.datetime.now().isoformat()
+                    user_ref = db.collection('users').document(user_id)
+                    user_ref.update({
+                        'lastLogout': now_iso,
+                        'lastSeen': now_iso
+                    })
+                    app.logger.info(f"Updated user logout time in Firestore: {user_id}")
+        except Exception as e:
+            app.logger.warning(f"Could not update user logout time in Firestore: {e}")
         
         return jsonify({
             'status': 'success',
@@ -399,12 +613,13 @@ def auth_signout():
         })
     except Exception as e:
         app.logger.error(f"Error during sign out: {str(e)}")
-        # Still clear the session even if there was an error
-        session.clear()
         return jsonify({
             'status': 'error',
             'message': f'Error during sign out: {str(e)}'
         }), 500
+    finally:
+        # Clear the session once, whether or not there was an error
+        session.clear()
 
 @app.route('/api/generate-document', methods=['POST'])
 def generate_document():
@@ -420,34 +635,20 @@ def generate_document():
         document_type = data['documentType']
         fields = data['fields']
         
-        # Build a prompt for Gemini based on document type and fields
-        prompt = f"You are an expert legal document generator specialized in Indian law. Generate a professional {document_type} with the following details:\n\n"
-        
-        # Add fields to prompt
-        for field_name, field_value in fields.items():
-            # Convert field name from kebab-case to readable format
-            readable_field = field_name.replace('-', ' ').title()
-            prompt += f"{readable_field}: {field_value}\n"
-        
-        # Additional instructions based on document type
-        if document_type == 'employment':
-            prompt += "\nThis should be a comprehensive employment contract compliant with Indian labor laws. Include sections for compensation, working hours, confidentiality, intellectual property, termination conditions, and dispute resolution."
-        elif document_type == 'nda':
-            prompt += "\nThis should be a detailed non-disclosure agreement that protects confidential information under Indian law. Include sections defining confidential information, obligations of the receiving party, exclusions, term of agreement, and remedies for breach."
-        elif document_type == 'lease':
-            prompt += "\nThis should be a comprehensive lease agreement compliant with Indian property laws and Rent Control Acts. Include sections on rent, security deposit, maintenance responsibilities, term of lease, conditions for termination, and dispute resolution."
-        elif document_type == 'service':
-            prompt += "\nThis should be a detailed service agreement compliant with Indian contract law. Include sections on scope of services, payment terms, intellectual property rights, confidentiality, term and termination, warranties, and limitations of liability."
-        elif document_type == 'shareholders':
-            prompt += "\nThis should be a comprehensive shareholders agreement compliant with the Indian Companies Act, 2013. Include sections on share ownership, transfer restrictions, management structure, dividend policy, reserved matters, dispute resolution, and exit provisions."
-        else:  # custom
-            prompt += "\nThis should be a professional legal document that addresses the specified requirements while ensuring compliance with relevant Indian laws and regulations."
-        
-        # Add general instructions
-        prompt += "\n\nFormat the document professionally with clear sections, numbering, and legal language. Ensure all provisions are legally sound and compliant with current Indian legislation."
+        # Render the prompt for this document type with readable field names
+        # Unknown or non-string types (e.g. a JSON list) get the custom prompt
+        if isinstance(document_type, str) and document_type in PROMPT_TEMPLATES:
+            prompt_template = PROMPT_TEMPLATES[document_type]
+        else:
+            prompt_template = PROMPT_TEMPLATES['custom']
+        prompt = prompt_template.render(
+            document_type=document_type,
+            fields=[(field_name.replace('-', ' ').title(), field_value) for field_name, field_value in fields.items()]
+        )
         
         # Use Gemini to generate the document
-        document_content = analyze_text_with_gemini(prompt, app.config['GEMINI_API_KEY'])
+        from gemini_client import analyze_text_with_gemini
+        document_content = analyze_text_with_gemini(prompt, app.config['GEMINI_API_KEY'], app.config['GEMINI_MODEL'])
         
         # Return the generated document
         return jsonify({
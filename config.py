@@ -1,5 +1,54 @@
 import os
+import re
+import stat
+import time
+import shutil
 import logging
+from jinja2 import FileSystemBytecodeCache
+
+# Uploads are only needed until their text is extracted, so keep them in RAM
+# when possible. tmpfs is only used if it can hold a full-size (16 MB) upload
+# for each of the 16 request threads (2 workers x 8 threads); container
+# /dev/shm is often just 64 MB, in which case uploads go to disk instead.
+TMPFS_UPLOAD_FOLDER = '/dev/shm/lexai_uploads'
+TMPFS_MIN_FREE = 16 * 16 * 1024 * 1024
+DISK_UPLOAD_FOLDER = 'uploads'
+STALE_UPLOAD_AGE = 5 * 60  # seconds
+# analyze_document saves uploads as '<uuid4>_<filename>'; UPLOAD_FOLDER may
+# point at a shared directory, so the purge never touches any other name
+UPLOAD_NAME_PATTERN = re.compile(r'[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}_')
+
+def default_upload_folder():
+    """Pick a private tmpfs upload directory, falling back to disk."""
+    tmpfs_root = os.path.dirname(TMPFS_UPLOAD_FOLDER)
+    if not os.path.isdir(tmpfs_root) or shutil.disk_usage(tmpfs_root).free < TMPFS_MIN_FREE:
+        return DISK_UPLOAD_FOLDER
+    
+    try:
+        os.mkdir(TMPFS_UPLOAD_FOLDER, 0o700)
+    except FileExistsError:
+        pass
+    
+    # /dev/shm is world-writable, so only trust a real directory that we own
+    # and nobody else can read; another user could have created it first
+    info = os.lstat(TMPFS_UPLOAD_FOLDER)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        logging.warning(f"{TMPFS_UPLOAD_FOLDER} is not a private directory; storing uploads on disk")
+        return DISK_UPLOAD_FOLDER
+    return TMPFS_UPLOAD_FOLDER
+
+def purge_stale_uploads(upload_folder, max_age=STALE_UPLOAD_AGE):
+    """Delete uploads left behind by requests that never cleaned up after themselves."""
+    cutoff = time.time() - max_age
+    with os.scandir(upload_folder) as entries:
+        for entry in entries:
+            try:
+                if (UPLOAD_NAME_PATTERN.match(entry.name) and entry.is_file()
+                        and entry.stat().st_mtime < cutoff):
+                    os.unlink(entry.path)
+            except FileNotFoundError:
+                # Another worker removed it first
+                pass
 
 def configure_app(app):
     """Configure Flask application with environment settings."""
@@ -15,6 +64,11 @@ def configure_app(app):
     app.config['GEMINI_API_KEY'] = gemini_key
     app.config['GEMINI_KEY'] = gemini_key
     
+    # Gemini model used for analysis and document generation. gemini_client
+    # calls the REST API directly; set GEMINI_MODEL to pin a different model.
+    app.config['GEMINI_MODEL'] = os.environ.get('GEMINI_MODEL', 'gemini-2.0-flash')
+    app.logger.info(f"Using Gemini model: {app.config['GEMINI_MODEL']}")
+    
     # Firebase configuration
     app.config['FIREBASE_API_KEY'] = os.environ.get('FIREBASE_API_KEY', '')
     app.config['FIREBASE_PROJECT_ID'] = os.environ.get('FIREBASE_PROJECT_ID', '')
@@ -27,11 +81,29 @@ def configure_app(app):
     
     # File upload configurations
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-    app.config['UPLOAD_FOLDER'] = 'uploads'
-    app.config['ALLOWED_EXTENSIONS'] = {'txt', 'pdf', 'doc', 'docx', 'rtf'}
+    app.config['UPLOAD_FOLDER'] = os.environ.get('UPLOAD_FOLDER') or default_upload_folder()
+    app.config['ALLOWED_EXTENSIONS'] = frozenset({'txt', 'pdf', 'doc', 'docx', 'rtf'})
+    
+    # Response cache for Gemini analyses (Flask-Caching)
+    app.config['CACHE_TYPE'] = 'FileSystemCache'
+    app.config['CACHE_DIR'] = 'cache'
+    app.config['CACHE_DEFAULT_TIMEOUT'] = 24 * 60 * 60  # 1 day
+    
+    # Let browsers cache static assets for an hour instead of revalidating each load
+    app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 60 * 60
     
     # Session configuration
     app.secret_key = os.environ.get("SESSION_SECRET", "lex-ai-secure-session-key-2025")
     
     # Ensure upload directory exists
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    purge_stale_uploads(app.config['UPLOAD_FOLDER'])
+    
+    # Keep compiled templates on disk so restarted workers skip parsing them.
+    # Template auto-reload already stays off outside debug mode.
+    os.makedirs('.jinja_cache', exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory='.jinja_cache')
+    
+    # Compile every template at boot so the first request doesn't pay for it
+    for template_name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(template_name)
@@ -1,11 +1,12 @@
 """
 Firebase configuration for LexAI application.
-This module initializes Firebase services and provides helper functions.
+This module initializes Firebase services on first use and provides helper functions.
 """
 
 import os
 import json
 import logging
+import threading
 import importlib.util
 
 # Firebase configuration for client-side use
@@ -27,13 +28,26 @@ bucket = None
 firebase_initialized = False
 client_side_only_mode = False
 
+# Serializes first-use initialization across request threads
+_init_lock = threading.Lock()
+
 def initialize_firebase():
     """Initialize Firebase services for the application."""
-    global firebase_app, db, bucket, firebase_initialized, client_side_only_mode
-    
     if firebase_initialized:
         return firebase_app, db, bucket
     
+    with _init_lock:
+        # Another thread may have finished (or given up) while we waited
+        if firebase_initialized:
+            return firebase_app, db, bucket
+        if client_side_only_mode:
+            return None, None, None
+        return _initialize_firebase()
+
+def _initialize_firebase():
+    """Set up the Firebase admin SDK; callers must hold _init_lock."""
+    global firebase_app, db, bucket, firebase_initialized, client_side_only_mode
+    
     # Check if firebase_admin is installed
     if importlib.util.find_spec("firebase_admin") is None:
         logging.warning("firebase_admin package not installed. Using client-side only mode.")
@@ -91,9 +105,6 @@ def initialize_firebase():
         client_side_only_mode = True
         return None, None, None
 
-# Try to initialize Firebase
-firebase_app, db, bucket = initialize_firebase()
-
 def get_firestore_db():
     """Get Firestore database instance."""
     global db
@@ -0,0 +1,80 @@
+"""
+Gemini API client for LexAI application.
+This module sends prompts to the Gemini REST API over a shared, pooled HTTP session.
+It replaces the google-generativeai SDK wrapper; the model is chosen explicitly
+by the caller (app.config['GEMINI_MODEL']) and the reply is the concatenated
+text parts of the first candidate.
+"""
+
+import os
+import time
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
+GEMINI_TIMEOUT = 60
+MAX_RETRY_DELAY = 30
+# In-flight Gemini calls allowed per gunicorn worker process. The limit is
+# per worker, so the deployment-wide cap is this times the worker count, and
+# it only has an effect while it is below the worker's thread count (8).
+DEFAULT_GEMINI_CONCURRENCY = 4
+
+class GeminiClient:
+    """Gemini API client that limits concurrent calls and retries rate-limited ones."""
+
+    def __init__(self, max_concurrency=None, max_retries=3):
+        if max_concurrency is None:
+            max_concurrency = int(os.environ.get('GEMINI_CONCURRENCY', DEFAULT_GEMINI_CONCURRENCY))
+        self.sem = threading.BoundedSemaphore(max_concurrency)
+        self.max_retries = max_retries
+
+        # Process-wide session so Gemini calls reuse keep-alive connections
+        # instead of paying a TLS handshake on every request
+        self.http_session = requests.Session()
+        self.http_session.mount('https://', HTTPAdapter(pool_connections=32, pool_maxsize=64))
+
+    def generate(self, prompt, api_key, model):
+        """Send a prompt to the given Gemini model and return the generated text."""
+        for attempt in range(self.max_retries + 1):
+            with self.sem:
+                response = self.http_session.post(
+                    GEMINI_API_URL.format(model=model),
+                    headers={'x-goog-api-key': api_key},
+                    json={'contents': [{'parts': [{'text': prompt}]}]},
+                    timeout=GEMINI_TIMEOUT
+                )
+            if response.status_code != 429 or attempt == self.max_retries:
+                break
+
+            # Wait outside the semaphore so a throttled call doesn't hold a slot
+            delay = self._retry_delay(response, attempt)
+            logging.warning(f"Gemini rate limit hit, retrying in {delay}s (attempt {attempt + 1})")
+            time.sleep(delay)
+
+        response.raise_for_status()
+        data = response.json()
+
+        candidates = data.get('candidates') or []
+        if not candidates:
+            logging.error(f"Gemini returned no candidates: {data.get('promptFeedback')}")
+            raise ValueError('Gemini returned no content for this prompt')
+
+        parts = candidates[0].get('content', {}).get('parts', [])
+        return ''.join(part.get('text', '') for part in parts)
+
+    @staticmethod
+    def _retry_delay(response, attempt):
+        """Seconds to wait before retrying, from Retry-After or exponential backoff."""
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return min(int(retry_after), MAX_RETRY_DELAY)
+        return min(2 ** attempt, MAX_RETRY_DELAY)
+
+# Shared client for all requests in this process
+gemini = GeminiClient()
+
+def analyze_text_with_gemini(prompt, api_key, model):
+    """Send a prompt to the given Gemini model and return the generated text."""
+    return gemini.generate(prompt, api_key, model)
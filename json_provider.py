@@ -0,0 +1,50 @@
+"""
+JSON provider for LexAI application.
+This module serializes Flask JSON responses and request bodies with orjson.
+"""
+
+import json
+import decimal
+import orjson
+from flask.json.provider import JSONProvider
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+def _default(obj):
+    """Serialize types orjson doesn't handle natively, as Flask's default provider does."""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson."""
+
+    mimetype = 'application/json'
+
+    def dumps(self, obj, **kwargs):
+        """Serialize data as a JSON string."""
+        if kwargs:
+            # orjson has no equivalent for json.dumps options, e.g. the
+            # separators Flask's session serializer passes on 2.3 and 3.x
+            kwargs.setdefault('default', _default)
+            return json.dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS).decode()
+
+    def loads(self, s, **kwargs):
+        """Deserialize data from a JSON string or bytes."""
+        if kwargs:
+            # Options such as object_hook, which Flask 2.3 uses to untag
+            # session values, need the standard library decoder; Flask 3.x
+            # untags after a plain loads, so its sessions still use orjson
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Build a JSON response, passing orjson's bytes straight to the body."""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS),
+            mimetype=self.mimetype
+        )